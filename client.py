@@ -1,45 +1,89 @@
 # client.py
 import socket
+import selectors
 import os
+import sys
+from collections import deque
 
 HOST = "127.0.0.1"
 PORT = int(os.environ.get("BBS_PORT", "6500"))
+RECV_BUFFER_BYTES = 64 * 1024
 
 class ClientConn:
     def __init__(self, sock: socket.socket):
         self.sock = sock
-        self.buf = b""
+        self.buf = bytearray()
+        # Preallocated receive buffer; recv_into() fills it without
+        # allocating a new bytes object per read
+        self._recvbuf = bytearray(RECV_BUFFER_BYTES)
+        self._recvview = memoryview(self._recvbuf)
+
+    def fill(self) -> bool:
+        """
+        Do one recv into the buffer. Returns False if the connection closed.
+        """
+        n = self.sock.recv_into(self._recvview)
+        if not n:
+            return False
+        self.buf += self._recvview[:n]
+        return True
 
     def read_line(self) -> str | None:
         """
         Read exactly one newline-terminated line, preserving any extra bytes.
         Returns line including '\n', or None if connection closed cleanly.
         """
-        while b"\n" not in self.buf:
-            chunk = self.sock.recv(4096)
-            if not chunk:
+        scanned = 0
+        while True:
+            idx = self.buf.find(b"\n", scanned)
+            if idx >= 0:
+                break
+            scanned = len(self.buf)
+            if not self.fill():
                 return None
-            self.buf += chunk
 
-        line, self.buf = self.buf.split(b"\n", 1)
-        return (line + b"\n").decode("utf-8")
+        line = self.buf[:idx + 1].decode("utf-8")
+        del self.buf[:idx + 1]
+        return line
 
-def recv_count_framed(conn: ClientConn, first_line: str, expected_prefix: str) -> str | None:
+    def pop_lines(self) -> list[str]:
+        """
+        Remove and return every complete line currently buffered.
+        """
+        end = self.buf.rfind(b"\n")
+        if end < 0:
+            return []
+        # Split on b"\n" only: str.splitlines() would also break on \r, \f,
+        # \u2028 etc., which may appear inside a post body
+        lines = [piece.decode("utf-8") + "\n" for piece in self.buf[:end].split(b"\n")]
+        del self.buf[:end + 1]
+        return lines
+
+def frame_count(first_line: str, expected_prefix: str) -> int | None:
     """
-    Handles:
-        OK LIST <n>\n + n lines
-        OK HELP <n>\n + n lines
+    Returns <n> from an "OK LIST <n>" / "OK HELP <n>" header, or None if
+    first_line is not such a header.
     """
     if not first_line.startswith(expected_prefix):
-        return first_line
+        return None
 
     parts = first_line.strip().split()
     if len(parts) != 3:
-        return first_line
+        return None
 
     try:
-        n = int(parts[2])
+        return int(parts[2])
     except ValueError:
+        return None
+
+def recv_count_framed(conn: ClientConn, first_line: str, expected_prefix: str) -> str | None:
+    """
+    Handles:
+        OK LIST <n>\n + n lines
+        OK HELP <n>\n + n lines
+    """
+    n = frame_count(first_line, expected_prefix)
+    if n is None:
         return first_line
 
     lines = [first_line]
@@ -72,6 +116,147 @@ def recv_response(conn: ClientConn, sent_cmd: str) -> str | None:
 
     return first
 
+COUNT_FRAMED_PREFIXES = {"LIST": "OK LIST ", "HELP": "OK HELP "}
+
+class PendingResponses:
+    """
+    Tracks which responses are still owed for commands already sent, so the
+    selector-driven REPL knows when a (possibly count-framed) response is
+    complete and it is time to show the prompt again.
+    """
+    def __init__(self):
+        self.sent = deque() # command verbs awaiting their first line
+        self.body_lines_left = 0
+
+    def expect(self, sent_cmd: str):
+        self.sent.append(sent_cmd.strip().split(" ", 1)[0].upper())
+
+    def feed(self, line: str):
+        if self.body_lines_left:
+            self.body_lines_left -= 1
+            return
+        if not self.sent:
+            # Unsolicited line (server push); nothing to account for
+            return
+        cmd = self.sent.popleft()
+        prefix = COUNT_FRAMED_PREFIXES.get(cmd)
+        if prefix is not None:
+            self.body_lines_left = frame_count(line, prefix) or 0
+
+    def idle(self) -> bool:
+        return not self.sent and not self.body_lines_left
+
+def prompt():
+    sys.stdout.write("> ")
+    sys.stdout.flush()
+
+def run_blocking_repl(sock: socket.socket, conn: ClientConn):
+    """
+    One synchronous round-trip per command. Used where stdin cannot be
+    multiplexed with a socket (Windows, or stdin redirected from a file).
+    """
+    while True:
+        try:
+            user_input = input("> ")
+        except EOFError:
+            break
+
+        if not user_input.strip():
+            continue
+
+        try:
+            sock.sendall((user_input.rstrip("\n") + "\n").encode("utf-8"))
+        except ConnectionError:
+            print("Connection lost while sending.")
+            break
+
+        response = recv_response(conn, user_input)
+        if response is None:
+            print("Server closed the connection.")
+            break
+
+        print(response, end="")
+
+        if user_input.strip().upper() == "QUIT":
+            break
+
+def run_selector_repl(sock: socket.socket, conn: ClientConn):
+    """
+    Wait on stdin and the socket together: typed commands are sent as soon
+    as they are entered, and whatever the server sends is drained and
+    printed as it arrives, one recv for as many lines as are ready.
+    """
+    stdin_fd = sys.stdin.fileno()
+    stdin_buf = bytearray()
+    pending = PendingResponses()
+    quitting = False
+    stdin_open = True
+
+    sel = selectors.DefaultSelector()
+    try:
+        sel.register(stdin_fd, selectors.EVENT_READ, data="stdin")
+    except (PermissionError, ValueError):
+        # stdin is not pollable, e.g. a regular file (`client.py < cmds.txt`)
+        # under epoll; a plain blocking read loop handles that fine
+        sel.close()
+        run_blocking_repl(sock, conn)
+        return
+    sel.register(sock, selectors.EVENT_READ, data="sock")
+    prompt()
+
+    try:
+        while True:
+            for key, _ in sel.select():
+                if key.data == "sock":
+                    if not conn.fill():
+                        if not quitting:
+                            print("Server closed the connection.")
+                        return
+                    for line in conn.pop_lines():
+                        print(line, end="")
+                        pending.feed(line)
+                    if pending.idle():
+                        if quitting or not stdin_open:
+                            return
+                        prompt()
+                    continue
+
+                chunk = os.read(stdin_fd, 4096)
+                if not chunk:
+                    # EOF: stop reading input but let outstanding replies arrive
+                    stdin_open = False
+                    sel.unregister(stdin_fd)
+                    if pending.idle():
+                        return
+                    continue
+
+                stdin_buf += chunk
+                while not quitting:
+                    idx = stdin_buf.find(b"\n")
+                    if idx < 0:
+                        break
+                    user_input = stdin_buf[:idx].decode("utf-8", errors="replace")
+                    del stdin_buf[:idx + 1]
+
+                    if not user_input.strip():
+                        if pending.idle():
+                            prompt()
+                        continue
+
+                    try:
+                        sock.sendall((user_input.rstrip("\r") + "\n").encode("utf-8"))
+                    except ConnectionError:
+                        print("Connection lost while sending.")
+                        return
+                    pending.expect(user_input)
+
+                    if user_input.strip().upper() == "QUIT":
+                        # Ignore further input; exit once the server answers
+                        quitting = True
+                        sel.unregister(stdin_fd)
+    finally:
+        sel.close()
+
 def main():
     print(f"Connecting to server at {HOST}:{PORT}...")
     try:
@@ -80,6 +265,9 @@ def main():
         print("Could not connect - is the server running?")
         return
 
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
     conn = ClientConn(sock)
 
     print("Connected. Type commands or QUIT to exit.")
@@ -88,31 +276,10 @@ def main():
     print()
 
     try:
-        while True:
-            try:
-                user_input = input("> ")
-            except EOFError:
-                break
-
-            if not user_input.strip():
-                continue
-
-            try:
-                sock.sendall((user_input.rstrip("\n") + "\n").encode("utf-8"))
-            except ConnectionError:
-                print("Connection lost while sending.")
-                break
-
-            response = recv_response(conn, user_input)
-            if response is None:
-                print("Server closed the connection.")
-                break
-
-            print(response, end="")
-
-            if user_input.strip().upper() == "QUIT":
-                break
-
+        if os.name == "nt":
+            run_blocking_repl(sock, conn)
+        else:
+            run_selector_repl(sock, conn)
     except KeyboardInterrupt:
         print("\nInterrupted by user.")
     finally:
@@ -123,4 +290,4 @@ def main():
             pass
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,10 +1,35 @@
 # protocol.py
+#
+# Board invariant: `posts` is kept in ascending id order by construction.
+# It is an append-only list where post <id> lives at index id - 1 and a
+# deleted post leaves a None tombstone, so iterating `posts` yields LIST
+# order without a sort and the next id is always len(posts) + 1.
+import hashlib
+import os
+import re
 import time
-from argon2 import PasswordHasher
+from collections import ChainMap, OrderedDict
+from types import MappingProxyType
+from argon2 import PasswordHasher, Type
 from argon2.exceptions import VerifyMismatchError
 from typing import Optional
 
-ph = PasswordHasher()
+# Argon2id parameters. RFC 9106 section 4 recommends t=1, m=2 GiB (or
+# t=3, m=64 MiB when memory is constrained); that is far heavier than a
+# small BBS needs, so default to the OWASP minimum (t=2, m=19 MiB, p=1).
+# Override per deployment with BBS_ARGON2_T / BBS_ARGON2_M (KiB) / BBS_ARGON2_P.
+ARGON2_TIME_COST = int(os.environ.get("BBS_ARGON2_T", "2"))
+ARGON2_MEMORY_COST = int(os.environ.get("BBS_ARGON2_M", str(19 * 1024)))
+ARGON2_PARALLELISM = int(os.environ.get("BBS_ARGON2_P", "1"))
+
+ph = PasswordHasher(
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM,
+    hash_len=32,
+    salt_len=16,
+    type=Type.ID,
+)
 
 _SEEDED_PLAINTEXT_USERS = {
     "oliver": {"password": "pw1", "role": "user"},
@@ -12,53 +37,251 @@ _SEEDED_PLAINTEXT_USERS = {
     "admin": {"password": "adminpw", "role": "admin"},
 }
 
-def _hash_seeded_users() -> dict:
+# Encoded Argon2id hashes of the seeded passwords, generated once with the
+# default parameters above so importing this module does not pay three
+# Argon2 passes. Set BBS_REHASH_SEED=1 to hash them fresh at startup instead.
+_SEEDED_HASHES = {
+    "oliver": "$argon2id$v=19$m=19456,t=2,p=1$r7KFgAMDhIjoSPQjf21VDw$aD9gCInDLh0JGe70jkDkX5HXs8R08TbNEO/CWC+BmN4",
+    "sam":    "$argon2id$v=19$m=19456,t=2,p=1$WI6ZpC3c90B0qvfMyiL2yQ$RTmw1GyxGQMknOuT5T4bbrLRvsdGITajDusDPLkrjwk",
+    "admin":  "$argon2id$v=19$m=19456,t=2,p=1$yOjQCDGsG0y9rQQ9H1Rn5A$vt+PwltJUKCw/6Il4/7GaJo0AhrmUR4vakEm7ajZgcs",
+}
+
+def _seeded_users() -> MappingProxyType:
+    rehash = bool(os.environ.get("BBS_REHASH_SEED"))
     users = {}
     for username, rec in _SEEDED_PLAINTEXT_USERS.items():
-        users[username] = {
-            "pw_hash": ph.hash(rec["password"]),
+        pw_hash = ph.hash(rec["password"]) if rehash else _SEEDED_HASHES[username]
+        users[username] = MappingProxyType({
+            "pw_hash": pw_hash,
             "role": rec["role"],
-        }
-    return users
+        })
+    return MappingProxyType(users)
 
-USERS = _hash_seeded_users()
+# Seeded users are read-only; registrations and hash upgrades are written to
+# the mutable overlay, which ChainMap consults first.
+_REGISTERED_USERS: dict[str, dict] = {}
+USERS = ChainMap(_REGISTERED_USERS, _seeded_users())
 
 def register(username: str, password: str) -> tuple[bool, str]:
     if username in USERS:
         return False, "ERR username_taken"
-    if len(password) < 10:
+    # Encode once: the length rule counts UTF-8 bytes and Argon2 hashes them
+    pw_bytes = password.encode("utf-8")
+    if len(pw_bytes) < 10:
         return False, "ERR password_too_short"
-    
-    pw_hash = ph.hash(password)
+
+    pw_hash = ph.hash(pw_bytes)
     USERS[username] = {"pw_hash": pw_hash}
     return True, "OK registered"
 
-def verify_password(record: dict, password: str) -> bool:
+# Short-lived cache of Argon2 verification results so an active client that
+# logs in repeatedly does not pay the memory-hard hash every time.
+# (username, sha256(password)) -> (monotonic timestamp, ok)
+VERIFY_CACHE_TTL_S = 60.0
+VERIFY_CACHE_MAX = 1024
+_verify_cache: OrderedDict[tuple[str, bytes], tuple[float, bool]] = OrderedDict()
+
+def _evict_expired(now: float) -> None:
+    # Entries are kept in insertion/refresh order, so the oldest are first
+    while _verify_cache:
+        key, (ts, _) = next(iter(_verify_cache.items()))
+        if now - ts < VERIFY_CACHE_TTL_S:
+            break
+        del _verify_cache[key]
+
+def verify_password(record: dict, password: str | bytes, username: str) -> bool:
     stored_hash = record.get("pw_hash")
     if not stored_hash:
         return False
 
+    if isinstance(password, str):
+        password = password.encode("utf-8")
+
+    now = time.monotonic()
+    key = (username, hashlib.sha256(password).digest())
+    cached = _verify_cache.get(key)
+    if cached is not None and now - cached[0] < VERIFY_CACHE_TTL_S:
+        return cached[1]
+
     try:
         ok = ph.verify(stored_hash, password)
     except VerifyMismatchError:
-        return False
-    return True
+        ok = False
+
+    # Transparently upgrade hashes created with older parameters
+    if ok and ph.check_needs_rehash(stored_hash):
+        USERS[username] = {**record, "pw_hash": ph.hash(password)}
+
+    _verify_cache[key] = (now, ok)
+    _verify_cache.move_to_end(key)
+    _evict_expired(now)
+    while len(_verify_cache) > VERIFY_CACHE_MAX:
+        _verify_cache.popitem(last=False)
+    return ok
+
+class R:
+    """
+    Constant protocol responses, encoded once so handlers can return
+    them without building or encoding a new string per request.
+    """
+    BAD_SYNTAX = b"ERR BAD_SYNTAX\n"
+    UNKNOWN_COMMAND = b"ERR UNKNOWN_COMMAND\n"
+    NOT_LOGGED_IN = b"ERR Not logged in\n"
+    INVALID_CREDENTIALS = b"ERR Invalid credentials\n"
+    ALREADY_LOGGED_IN = b"ERR Already logged in\n"
+    EMPTY_MESSAGE = b"ERR Empty message\n"
+    NOT_FOUND = b"ERR Not found\n"
+    NOT_AUTHORIZED = b"ERR Not authorized\n"
+    BYE = b"OK Bye\n"
+    RESET = b"OK Reset\n"
+    SESSION_RESET = b"OK Session reset\n"
 
 class Post:
+    __slots__ = ("id", "author", "timestamp", "message", "_line", "_get_line")
+
     def __init__(self, post_id, author, timestamp, message):
         self.id = post_id
         self.author = author
         self.timestamp = timestamp
         self.message = message
+        # Posts are immutable once created, so serialize them once:
+        # _line is the LIST body line, _get_line the full GET response
+        self._line = f"{post_id} {author} {timestamp} {message}\n".encode("utf-8")
+        self._get_line = b"OK " + self._line
+
+posts: list[Optional[Post]] = []
+live_count = 0 # posts that are not tombstones
+
+def _find_post(post_id: int) -> Optional[Post]:
+    i = post_id - 1
+    if 0 <= i < len(posts):
+        return posts[i]
+    return None
+
+# (unix second, formatted timestamp) of the most recent POST; bursts of
+# posts within one second reuse the formatted string
+_ts_cache: tuple[int, str] = (0, "")
+
+def _timestamp() -> str:
+    global _ts_cache
 
-posts: dict[int, Post] = {}
-next_post_id = 1
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache = (now, time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now)))
+    return _ts_cache[1]
 
-def require_auth(client) -> Optional[str]:
+# Serialized LIST response fragments; rebuilt lazily after POST/DEL mutate
+# posts. Callers must treat the cached list as read-only.
+_list_cache: Optional[list[bytes]] = None
+
+def require_auth(client) -> Optional[bytes]:
     if not getattr(client, "authenticated", False):
-        return "ERR Not logged in\n"
+        return R.NOT_LOGGED_IN
     return None
 
+# Arguments are separated by whitespace as str.split() defines it. bytes
+# methods only know ASCII space/tab/CR/LF/VT/FF, so any line that also has
+# \x1c-\x1f or non-ASCII bytes (U+3000, U+00A0, ...) is split as text.
+_NEEDS_STR_SPLIT = re.compile(rb"[\x1c-\x1f\x80-\xff]")
+
+def _split_args(rest: bytes) -> list[bytes]:
+    if _NEEDS_STR_SPLIT.search(rest) is None:
+        return rest.split()
+    return [part.encode("utf-8") for part in rest.decode("utf-8").split()]
+
+def _is_blank(rest: bytes) -> bool:
+    if _NEEDS_STR_SPLIT.search(rest) is None:
+        return not rest.strip()
+    return not rest.decode("utf-8").strip()
+
+def _parse_id(token: bytes) -> Optional[int]:
+    # int() of bytes only accepts ASCII digits; int() of str accepts any
+    # Unicode decimal digits, as the protocol always has
+    try:
+        return int(token if token.isascii() else token.decode("utf-8"))
+    except ValueError:
+        return None
+
+_HELP_GENERAL_BODY = [
+    "LOGIN <username> <password>",
+    "POST <message...>",
+    "LIST",
+    "GET <id>",
+    "DEL <id>",
+    "WHOAMI",
+    "RESET",
+    "RESET_SESSION",
+    "HELP [command]",
+    "QUIT",
+    "EXAMPLES:",
+    "  LOGIN oliver pw1",
+    "  POST hello world",
+    "  LIST",
+    "  GET 1",
+    "  DEL 1",
+    "  WHOAMI",
+    "  QUIT",
+]
+
+_HELP_TOPIC_BODIES = {
+    "LOGIN": [
+        "TOPIC: LOGIN",
+        "Syntax: LOGIN <username> <password>",
+        "Notes: Must be called before POST/LIST/GET/DEL/WHOAMI.",
+    ],
+    "POST": [
+        "TOPIC: POST",
+        "Syntax: POST <message...>",
+        "Notes: Author is your authenticated username; message is the rest of the line.",
+    ],
+    "LIST": [
+        "TOPIC: LIST",
+        "Syntax: LIST",
+        "Response: OK LIST <count> followed by <count> post lines.",
+    ],
+    "GET": [
+        "TOPIC: GET",
+        "Syntax: GET <id>",
+    ],
+    "DEL": [
+        "TOPIC: DEL",
+        "Syntax: DEL <id>",
+        "Notes: Allowed if you are admin or you are the post author.",
+    ],
+    "WHOAMI": [
+        "TOPIC: WHOAMI",
+        "Syntax: WHOAMI",
+        "Response: OK WHOAMI <username> <role>",
+    ],
+    "RESET": [
+        "TOPIC: RESET",
+        "Syntax: RESET",
+        "Notes: Admin only. Deletes every post and restarts ids at 1.",
+    ],
+    "RESET_SESSION": [
+        "TOPIC: RESET_SESSION",
+        "Syntax: RESET_SESSION",
+        "Notes: Logs this connection out without disconnecting.",
+    ],
+    "HELP": [
+        "TOPIC: HELP",
+        "Syntax: HELP",
+        "        HELP <command>",
+    ],
+    "QUIT": [
+        "TOPIC: QUIT",
+        "Syntax: QUIT",
+        "Notes: Server will close the connection after responding.",
+    ],
+}
+
+def _count_framed_help(body: list[str]) -> bytes:
+    return ("OK HELP " + str(len(body)) + "\n" + "\n".join(body) + "\n").encode("utf-8")
+
+# HELP output never changes, so frame every response once at import
+HELP_GENERAL = _count_framed_help(_HELP_GENERAL_BODY)
+HELP_TOPICS = {cmd.encode("ascii"): _count_framed_help(body) for cmd, body in _HELP_TOPIC_BODIES.items()}
+
 def handle_help(client, rest):
     """
     HELP
@@ -68,82 +291,15 @@ def handle_help(client, rest):
         OK HELP <n>\n
         <n> lines follow
     """
-    arg = rest.strip()
-
-    if arg == "":
-        body = [
-            "LOGIN <username> <password>",
-            "POST <message...>",
-            "LIST",
-            "GET <id>",
-            "DEL <id>",
-            "WHOAMI",
-            "HELP [command]",
-            "QUIT",
-            "EXAMPLES:",
-            "  LOGIN oliver pw1",
-            "  POST hello world",
-            "  LIST",
-            "  GET 1",
-            "  DEL 1",
-            "  WHOAMI",
-            "  QUIT",
-        ]
-        return "OK HELP " + str(len(body)) + "\n" + "\n".join(body) + "\n"
-
-    parts = arg.split()
+    parts = _split_args(rest)
+
+    if not parts:
+        return HELP_GENERAL
+
     if len(parts) != 1:
-        return "ERR BAD_SYNTAX\n"
-
-    cmd = parts[0].upper()
-
-    details = {
-        "LOGIN": [
-            "TOPIC: LOGIN",
-            "Syntax: LOGIN <username> <password>",
-            "Notes: Must be called before POST/LIST/GET/DEL/WHOAMI.",
-        ],
-        "POST": [
-            "TOPIC: POST",
-            "Syntax: POST <message...>",
-            "Notes: Author is your authenticated username; message is the rest of the line.",
-        ],
-        "LIST": [
-            "TOPIC: LIST",
-            "Syntax: LIST",
-            "Response: OK LIST <count> followed by <count> post lines.",
-        ],
-        "GET": [
-            "TOPIC: GET",
-            "Syntax: GET <id>",
-        ],
-        "DEL": [
-            "TOPIC: DEL",
-            "Syntax: DEL <id>",
-            "Notes: Allowed if you are admin or you are the post author.",
-        ],
-        "WHOAMI": [
-            "TOPIC: WHOAMI",
-            "Syntax: WHOAMI",
-            "Response: OK WHOAMI <username> <role>",
-        ],
-        "HELP": [
-            "TOPIC: HELP",
-            "Syntax: HELP",
-            "        HELP <command>",
-        ],
-        "QUIT": [
-            "TOPIC: QUIT",
-            "Syntax: QUIT",
-            "Notes: Server will close the connection after responding.",
-        ],
-    }
-
-    if cmd not in details:
-        return "ERR UNKNOWN_COMMAND\n"
-
-    body = details[cmd]
-    return "OK HELP " + str(len(body)) + "\n" + "\n".join(body) + "\n"
+        return R.BAD_SYNTAX
+
+    return HELP_TOPICS.get(parts[0].upper(), R.UNKNOWN_COMMAND)
 
 def handle_whoami(client, rest):
     """
@@ -152,9 +308,9 @@ def handle_whoami(client, rest):
     err = require_auth(client)
     if err:
         return err
-    if rest.strip():
-        return "ERR BAD_SYNTAX\n"
-    return f"OK WHOAMI {client.username} {client.role}\n"
+    if not _is_blank(rest):
+        return R.BAD_SYNTAX
+    return f"OK WHOAMI {client.username} {client.role}\n".encode("utf-8")
 
 def handle_login(client, rest):
     """
@@ -165,25 +321,26 @@ def handle_login(client, rest):
     - Assign role from USERS[username]["role"]
     """
     if getattr(client, "authenticated", False):
-        return "ERR Already logged in\n"
+        return R.ALREADY_LOGGED_IN
 
-    parts = rest.split()
+    parts = _split_args(rest)
     if len(parts) != 2:
-        return "ERR BAD_SYNTAX\n"
+        return R.BAD_SYNTAX
 
-    username, password = parts
+    username = parts[0].decode("utf-8")
+    password = parts[1]  # stays bytes; Argon2 and the cache key hash bytes
     record = USERS.get(username)
     if record is None:
         # Keep message generic (avoid user enumeration)
-        return "ERR Invalid credentials\n"
+        return R.INVALID_CREDENTIALS
 
-    if not verify_password(record, password):
-        return "ERR Invalid credentials\n"
+    if not verify_password(record, password, username):
+        return R.INVALID_CREDENTIALS
 
     client.username = username
     client.role = record.get("role", "user")
     client.authenticated = True
-    return f"OK Logged in as {username} ({client.role})\n"
+    return f"OK Logged in as {username} ({client.role})\n".encode("utf-8")
 
 def handle_post(client, rest):
     """
@@ -191,43 +348,55 @@ def handle_post(client, rest):
     Message is the entire rest string (preserve spacing),
     but must not be empty/whitespace-only.
     """
-    global next_post_id, posts
+    global live_count, _list_cache
 
     err = require_auth(client)
     if err:
         return err
 
-    if not rest.strip():
-        return "ERR Empty message\n"
+    if _is_blank(rest):
+        return R.EMPTY_MESSAGE
 
-    post_id = next_post_id
-    next_post_id += 1
+    post_id = len(posts) + 1
 
-    ts = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime())
-    message = rest  # preserve original rest
+    ts = _timestamp()
+    message = rest.decode("utf-8")  # preserve original rest
 
     post = Post(post_id, client.username, ts, message)
-    posts[post_id] = post
+    posts.append(post)
+    live_count += 1
+    _list_cache = None
 
-    return f"OK Post {post_id} created\n"
+    return f"OK Post {post_id} created\n".encode("utf-8")
+
+def _list_fragments() -> list[bytes]:
+    """
+    LIST response as a header fragment followed by each post's cached line.
+    The server writes the fragments with sendmsg(), so the payload is never
+    concatenated into one contiguous buffer.
+    """
+    fragments = [f"OK LIST {live_count}\n".encode("utf-8")]
+    # Already in ascending id order (see the invariant at the top)
+    fragments.extend(p._line for p in posts if p is not None)
+    return fragments
 
 def handle_list(client, rest):
     """
     LIST
     Enforce no args (keeps protocol predictable for testing).
     """
+    global _list_cache
+
     err = require_auth(client)
     if err:
         return err
 
-    if rest.strip():
-        return "ERR BAD_SYNTAX\n"
+    if not _is_blank(rest):
+        return R.BAD_SYNTAX
 
-    lines = [f"OK LIST {len(posts)}"]
-    for post_id in sorted(posts.keys()):
-        p = posts[post_id]
-        lines.append(f"{p.id} {p.author} {p.timestamp} {p.message}")
-    return "\n".join(lines) + "\n"
+    if _list_cache is None:
+        _list_cache = _list_fragments()
+    return _list_cache
 
 def handle_get(client, rest):
     """
@@ -237,20 +406,19 @@ def handle_get(client, rest):
     if err:
         return err
 
-    parts = rest.split()
+    parts = _split_args(rest)
     if len(parts) != 1:
-        return "ERR BAD_SYNTAX\n"
+        return R.BAD_SYNTAX
 
-    try:
-        post_id = int(parts[0])
-    except ValueError:
-        return "ERR BAD_SYNTAX\n"
+    post_id = _parse_id(parts[0])
+    if post_id is None:
+        return R.BAD_SYNTAX
 
-    post = posts.get(post_id)
+    post = _find_post(post_id)
     if post is None:
-        return "ERR Not found\n"
+        return R.NOT_FOUND
 
-    return f"OK {post.id} {post.author} {post.timestamp} {post.message}\n"
+    return post._get_line
 
 def handle_del(client, rest):
     """
@@ -259,59 +427,119 @@ def handle_del(client, rest):
     - client.role == 'admin' OR
     - post.author == client.username
     """
+    global live_count, _list_cache
+
     err = require_auth(client)
     if err:
         return err
 
-    parts = rest.split()
+    parts = _split_args(rest)
     if len(parts) != 1:
-        return "ERR BAD_SYNTAX\n"
+        return R.BAD_SYNTAX
 
-    try:
-        post_id = int(parts[0])
-    except ValueError:
-        return "ERR BAD_SYNTAX\n"
+    post_id = _parse_id(parts[0])
+    if post_id is None:
+        return R.BAD_SYNTAX
 
-    post = posts.get(post_id)
+    post = _find_post(post_id)
     if post is None:
-        return "ERR Not found\n"
+        return R.NOT_FOUND
 
     if client.role != "admin" and post.author != client.username:
-        return "ERR Not authorized\n"
+        return R.NOT_AUTHORIZED
+
+    posts[post_id - 1] = None
+    live_count -= 1
+    _list_cache = None
+    return f"OK Deleted {post_id}\n".encode("utf-8")
+
+def handle_reset(client, rest):
+    """
+    RESET
+    Admin only: delete every post and restart ids at 1.
+    """
+    global live_count, _list_cache
+
+    err = require_auth(client)
+    if err:
+        return err
+
+    if not _is_blank(rest):
+        return R.BAD_SYNTAX
+
+    if client.role != "admin":
+        return R.NOT_AUTHORIZED
+
+    posts.clear()
+    live_count = 0
+    _list_cache = None
+    return R.RESET
+
+def handle_reset_session(client, rest):
+    """
+    RESET_SESSION
+    Log this connection out without closing it.
+    """
+    if not _is_blank(rest):
+        return R.BAD_SYNTAX
 
-    del posts[post_id]
-    return f"OK Deleted {post_id}\n"
+    client.username = None
+    client.role = None
+    client.authenticated = False
+    return R.SESSION_RESET
 
 def handle_quit(client, rest):
-    if rest.strip():
-        return "ERR BAD_SYNTAX\n"
-    return "OK Bye\n"
+    if not _is_blank(rest):
+        return R.BAD_SYNTAX
+    return R.BYE
 
 COMMANDS = {
-    "HELP":   (handle_help, False),
-    "LOGIN":  (handle_login, False),
-    "POST":   (handle_post, False),
-    "LIST":   (handle_list, False),
-    "GET":    (handle_get, False),
-    "DEL":    (handle_del, False),
-    "WHOAMI": (handle_whoami, False),
-    "QUIT":   (handle_quit, True),
+    b"HELP":   (handle_help, False),
+    b"LOGIN":  (handle_login, False),
+    b"POST":   (handle_post, False),
+    b"LIST":   (handle_list, False),
+    b"GET":    (handle_get, False),
+    b"DEL":    (handle_del, False),
+    b"WHOAMI": (handle_whoami, False),
+    b"RESET":  (handle_reset, False),
+    b"RESET_SESSION": (handle_reset_session, False),
+    b"QUIT":   (handle_quit, True),
 }
 
-def process_line(client, line):
-    if line is None:
-        return (None, False)
+# Every verb is distinguished by (length, uppercased first byte), so dispatch
+# is one tuple-keyed lookup; `b & 0xDF` clears the ASCII lowercase bit.
+VERB_LOOKUP = {
+    (len(verb), verb[0]): (verb, handler, should_close)
+    for verb, (handler, should_close) in COMMANDS.items()
+}
+assert len(VERB_LOOKUP) == len(COMMANDS), "verbs must differ in (length, first byte)"
 
-    if line == "":
+def process_line(client, line: bytes):
+    """
+    Dispatch one raw command line (UTF-8 bytes, newline already removed).
+    Handlers receive the rest of the line as bytes and decode only the
+    parts they keep as text (usernames, passwords, post bodies).
+    """
+    if not line:
         return (None, False)
 
-    parts = line.split(" ", 1)
-    cmd = parts[0].upper()
-    rest = parts[1] if len(parts) > 1 else ""
+    sp = line.find(b" ")
+    if sp == -1:
+        verb, rest = line, b""
+    else:
+        verb, rest = line[:sp], line[sp + 1:]
+
+    if not verb:
+        return (R.UNKNOWN_COMMAND, False)
+
+    entry = VERB_LOOKUP.get((len(verb), verb[0] & 0xDF))
+    if entry is None:
+        return (R.UNKNOWN_COMMAND, False)
 
-    if cmd not in COMMANDS:
-        return ("ERR UNKNOWN_COMMAND\n", False)
+    canonical, handler, should_close = entry
+    # Clients almost always send uppercase verbs; only fold case on a mismatch
+    if verb != canonical and verb.upper() != canonical:
+        return (R.UNKNOWN_COMMAND, False)
 
-    handler, should_close = COMMANDS[cmd]
     response = handler(client, rest)
     return (response, should_close)
\ No newline at end of file
@@ -1,19 +1,39 @@
 # server.py
 import socket
-import select
+import selectors
 import os
+from collections import deque
+from itertools import islice
 
 from protocol import process_line
 
 HOST = "0.0.0.0"
 PORT = int(os.environ.get("BBS_PORT", "6500"))
+# Optional already-bound listening socket inherited from a parent process
+# (e.g. the test harness); when set, HOST/PORT are ignored
+LISTEN_FD = os.environ.get("BBS_LISTEN_FD")
 MAX_BUFFER_BYTES = 64 * 1024
+RECV_BUFFER_BYTES = 64 * 1024
+# Output high-water mark: once this many reply bytes are queued for a client
+# that is not reading them, stop reading and executing its requests until
+# the queue drains
+MAX_OUTPUT_BYTES = 1024 * 1024
+# Most platforms cap a single sendmsg() at IOV_MAX (1024) buffers
+MAX_IOVECS = 1024
+# Windows sockets have no sendmsg(); fall back to one send() per fragment
+HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+LINE_TOO_LONG = b"ERR Line too long\n"
 
 class ClientState:
     def __init__(self, sock, addr):
         self.sock = sock
         self.addr = addr
-        self.buffer = ""
+        self.buffer = bytearray()
+        self.outq = deque() # pending response fragments (bytes/memoryview)
+        self.out_bytes = 0 # total length of outq
+        self.held = False # complete lines left unprocessed at the high-water mark
+        self.closing = False
+        self.closed = False
         self.username = None
         self.role = None
         self.authenticated = False
@@ -24,7 +44,16 @@ class ClientState:
     def __repr__(self):
         return f"<ClientState {self.addr} {self.username}>"
 
-clients = {} # socket -> ClientState
+# The selector is the client registry: every connected socket is registered
+# once on accept with its ClientState as key.data, and unregistered on close.
+sel = selectors.DefaultSelector()
+
+# Shared receive buffer, in the spirit of asyncio.BufferedProtocol:
+# get_buffer() is this preallocated view, buffer_updated(n) is appending
+# view[:n] to the client's parse buffer. One buffer is enough because the
+# event loop handles one socket at a time.
+_recv_buf = bytearray(RECV_BUFFER_BYTES)
+_recv_view = memoryview(_recv_buf)
 
 def create_listening_socket(host, port):
     server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -34,17 +63,118 @@ def create_listening_socket(host, port):
     print(f"Server listening on {host}:{port}")
     return server_sock
 
+def adopt_listening_socket(fd):
+    # Family and type are read back from the fd itself
+    server_sock = socket.socket(fileno=fd)
+    server_sock.listen()
+    host, port = server_sock.getsockname()[:2]
+    print(f"Server listening on {host}:{port}")
+    return server_sock
+
+def configure_client_socket(sock):
+    # Responses are small single writes; don't let Nagle hold them back
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    sock.setblocking(False)
+
+def is_valid_utf8(data: bytes) -> bool:
+    # Protocol traffic is almost entirely ASCII; isascii() is a cheap C scan
+    if data.isascii():
+        return True
+    try:
+        data.decode("utf-8")
+    except UnicodeDecodeError:
+        return False
+    return True
+
+def get_client(sock):
+    try:
+        return sel.get_key(sock).data
+    except (KeyError, ValueError):
+        return None
+
 def close_client(sock):
-    client = clients.get(sock)
+    client = get_client(sock)
+    try:
+        sel.unregister(sock)
+    except (KeyError, ValueError):
+        pass
     try:
         sock.close()
     except Exception:
         pass
     if client is not None:
-        del clients[sock]
+        client.closed = True
+
+def flush_client(sock):
+    """
+    Send as much of the client's pending output as the socket accepts.
+    Whatever is left stays queued and the socket is watched for EVENT_WRITE
+    until it drains, so a slow reader never blocks the event loop.
+    """
+    client = get_client(sock)
+    if client is None:
+        return
+
+    outq = client.outq
+    while outq:
+        try:
+            if HAS_SENDMSG and len(outq) > 1:
+                # Scatter-gather: hand the kernel every queued fragment at once
+                sent = sock.sendmsg(list(islice(outq, MAX_IOVECS)))
+            else:
+                sent = sock.send(outq[0])
+        except BlockingIOError:
+            break
+        except ConnectionError:
+            print(f"Error sending to {client.addr}, closing connection")
+            close_client(sock)
+            return
+
+        if not sent:
+            break
+        client.out_bytes -= sent
+        # Drop fully sent fragments; keep a zero-copy view of a partial one
+        while sent:
+            head = outq[0]
+            if sent >= len(head):
+                sent -= len(head)
+                outq.popleft()
+            else:
+                outq[0] = memoryview(head)[sent:]
+                sent = 0
+
+    if outq:
+        events = selectors.EVENT_WRITE
+        if not client.closing and client.out_bytes < MAX_OUTPUT_BYTES:
+            events |= selectors.EVENT_READ
+    elif client.closing:
+        close_client(sock)
+        return
+    else:
+        events = selectors.EVENT_READ
+
+    # Only touch the selector when the interest set actually changes
+    if sel.get_key(sock).events != events:
+        sel.modify(sock, events, data=client)
+
+def pump_client(sock):
+    """
+    Flush pending output, and whenever that takes the queue back under
+    MAX_OUTPUT_BYTES, run any lines held back at the high-water mark. A
+    flush can drain the queue outright, after which no EVENT_WRITE would
+    ever come to resume them.
+    """
+    client = get_client(sock)
+    if client is None:
+        return
+    flush_client(sock)
+    while client.held and not client.closed and client.out_bytes < MAX_OUTPUT_BYTES:
+        process_lines(client)
+        flush_client(sock)
 
 def handle_client_socket(sock):
-    client = clients.get(sock)
+    client = get_client(sock)
     if client is None:
         # Unknown socket; close defensively
         try:
@@ -53,86 +183,129 @@ def handle_client_socket(sock):
             pass
         return
 
+    if client.closing or client.held:
+        # Already answered QUIT (ignore anything sent after it), or still
+        # backed up on output from earlier requests
+        return
+
+    # Unless held, the buffer only holds an unterminated tail between reads.
+    # Reading at most one byte past the limit lets the check at the end of
+    # process_lines() catch any over-long line, while complete lines never
+    # count against it.
+    room = MAX_BUFFER_BYTES + 1 - len(client.buffer)
+
     try:
-        data = sock.recv(4096)
+        nbytes = sock.recv_into(_recv_view, min(room, RECV_BUFFER_BYTES))
+    except BlockingIOError:
+        # Spurious wakeup; nothing to read yet
+        return
     except ConnectionError:
-        data = b""
+        nbytes = 0
 
-    if not data:
+    if not nbytes:
         print(f"Client {client.addr} disconnected")
         close_client(sock)
         return
 
-    try:
-        text = data.decode("utf-8")
-    except UnicodeDecodeError:
-        print(f"Bad data from {client.addr}, closing connection")
-        close_client(sock)
-        return
+    client.buffer += _recv_view[:nbytes]
+    process_lines(client)
+    pump_client(sock)
 
-    client.buffer += text
+def queue_response(client, response):
+    if isinstance(response, list):
+        client.outq.extend(response)
+        client.out_bytes += sum(map(len, response))
+    elif response:
+        client.outq.append(response)
+        client.out_bytes += len(response)
 
-    # Max buffer guard: if client sends a really long message
-    # cap memory usage and drop
-    if len(client.buffer.encode("utf-8", errors="ignore")) > MAX_BUFFER_BYTES:
-        try:
-            client.sock.sendall(b"ERR Line too long\n")
-        except Exception:
-            pass
-        close_client(sock)
-        return
+def process_lines(client):
+    """
+    Execute the complete lines in client.buffer and queue their replies.
+    Stops early, leaving the rest buffered and client.held set, once the
+    output queue reaches MAX_OUTPUT_BYTES.
+    """
+    # Scan complete lines in place and trim the consumed prefix once at the end
+    start = 0
+    bad_data = False
+    client.held = False
+    with memoryview(client.buffer) as view:
+        while True:
+            idx = client.buffer.find(b"\n", start)
+            if idx < 0:
+                break
+            if client.out_bytes >= MAX_OUTPUT_BYTES:
+                client.held = True
+                break
+            # Only remove CR. Do NOT strip spaces.
+            line = bytes(view[start:idx]).rstrip(b"\r")
+            start = idx + 1
 
-    while "\n" in client.buffer:
-        raw_line, client.buffer = client.buffer.split("\n", 1)
-        # Only remove CR. Do NOT strip spaces.
-        line = raw_line.rstrip("\r")
+            if line == b"":
+                continue
 
-        if line == "":
-            continue
+            if not is_valid_utf8(line):
+                bad_data = True
+                break
 
-        print(f"Received from {client.addr}: {line}")
+            print(f"Received from {client.addr}: {line.decode('utf-8')}")
 
-        response, should_close = process_line(client, line)
+            response, should_close = process_line(client, line)
+            queue_response(client, response)
 
-        if response:
-            try:
-                client.sock.sendall(response.encode("utf-8"))
-            except ConnectionError:
-                print(f"Error sending to {client.addr}, closing connection")
-                close_client(sock)
-                return
+            if should_close:
+                print(f"Closing connection for {client.addr} (protocol requested close)")
+                client.closing = True
+                break
 
-        if should_close:
-            print(f"Closing connection for {client.addr} (protocol requested close)")
-            close_client(sock)
-            return
+    if bad_data:
+        # Lines before the bad one have already run; deliver their replies
+        # before closing rather than discarding them
+        print(f"Bad data from {client.addr}, closing connection")
+        client.closing = True
+
+    del client.buffer[:start]
+
+    # Max line guard: if client sends a really long message
+    # cap memory usage and drop. Replies to the complete lines before it
+    # still go out first.
+    if not client.closing and not client.held and len(client.buffer) > MAX_BUFFER_BYTES:
+        print(f"Line too long from {client.addr}, closing connection")
+        queue_response(client, LINE_TOO_LONG)
+        client.closing = True
 
 def main():
-    server_sock = create_listening_socket(HOST, PORT)
+    if LISTEN_FD is not None:
+        server_sock = adopt_listening_socket(int(LISTEN_FD))
+    else:
+        server_sock = create_listening_socket(HOST, PORT)
+
+    sel.register(server_sock, selectors.EVENT_READ, data="accept")
 
     try:
         while True:
-            read_list = [server_sock] + [c.sock for c in clients.values()]
-
-            try:
-                readable, _, _ = select.select(read_list, [], [])
-            except OSError:
-                # Defensive: if a fd becomes invalid, rebuild loop
-                continue
-
-            for sock in readable:
-                if sock is server_sock:
+            for key, events in sel.select():
+                if key.data == "accept":
                     new_sock, addr = server_sock.accept()
                     print(f"New connection from {addr}")
-                    clients[new_sock] = ClientState(new_sock, addr)
-                else:
-                    handle_client_socket(sock)
+                    configure_client_socket(new_sock)
+                    client = ClientState(new_sock, addr)
+                    sel.register(new_sock, selectors.EVENT_READ, data=client)
+                    continue
+
+                client = key.data
+                if events & selectors.EVENT_WRITE:
+                    pump_client(key.fileobj)
+                if events & selectors.EVENT_READ and not client.closed:
+                    handle_client_socket(key.fileobj)
 
     except KeyboardInterrupt:
         print("\nShutting down server.")
     finally:
-        for s in list(clients.keys()):
-            close_client(s)
+        for key in list(sel.get_map().values()):
+            if key.data != "accept":
+                close_client(key.fileobj)
+        sel.close()
         server_sock.close()
 
 if __name__ == "__main__":
@@ -1,23 +1,60 @@
 # tests.py
+import atexit
 import os
+import queue
 import socket
 import subprocess
 import sys
+import tempfile
 import time
 import unittest
-import threading
-from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Optional
 
 HOST = "127.0.0.1"
-CONNECT_RETRIES = 60
-CONNECT_SLEEP_S = 0.05
-
-
-# Finds an available port to use for testing
-def pick_free_port() -> int:
-    with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as s:
+# Upper bound on server startup, measured to its first reply
+CONNECT_TIMEOUT_S = 3.0
+ADMIN_POOL_SIZE = 4
+# With TCP_NODELAY each partial send leaves immediately; a 1ms pause is
+# enough for the server to see the fragments as separate reads
+PARTIAL_SEND_PAUSE_S = 0.001
+READ_BUFFER_BYTES = 64 * 1024
+# Must be larger than MAX_BUFFER_BYTES in server.py (64KB)
+_HUGE_LINE = b"A" * (70 * 1024) + b"\n"
+SOCKET_BUFFER_BYTES = 256 * 1024
+
+
+# Binds a listening socket on a kernel-assigned port. It is handed to the
+# server as-is, so no other process can take the port in between.
+def open_listening_socket() -> socket.socket:
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
         s.bind((HOST, 0))
-        return s.getsockname()[1]
+        s.listen()
+    except OSError:
+        s.close()
+        raise
+    return s
+
+
+# HOST is a numeric IPv4 literal, so connect straight to (HOST, port) on an
+# AF_INET socket; unlike socket.create_connection this skips getaddrinfo()
+def open_socket(port: int, timeout: float) -> socket.socket:
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.settimeout(timeout)
+    # Fixed options so pipelined/partial-send timings don't depend on kernel
+    # defaults. Buffer sizes must be set before connect() to affect the
+    # advertised TCP window.
+    s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_BYTES)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_BYTES)
+    try:
+        s.connect((HOST, port))
+    except OSError:
+        s.close()
+        raise
+    return s
 
 
 def stop_server(proc: subprocess.Popen) -> None:
@@ -31,68 +68,113 @@ def stop_server(proc: subprocess.Popen) -> None:
             proc.kill()
 
 
-def start_server(port: int) -> subprocess.Popen:
+def _read_log(log) -> str:
+    log.seek(0)
+    return log.read().decode("utf-8", "replace")
+
+
+def start_server(listen_sock: socket.socket) -> subprocess.Popen:
     """
-    Start server.py from repo root
+    Start server.py from repo root, serving on (and taking ownership of)
+    the given listening socket.
     If server fails to start, we write its stdout for debugging.
     """
+    port = listen_sock.getsockname()[1]
     env = os.environ.copy()
-    env["BBS_PORT"] = str(port)
+    env["BBS_LISTEN_FD"] = str(listen_sock.fileno())
 
     root_dir = os.path.dirname(os.path.abspath(__file__))
     server_path = os.path.join(root_dir, "server.py")
 
-    proc = subprocess.Popen(
-        [sys.executable, server_path],
-        env=env,
-        cwd=root_dir,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-    )
-
-    time.sleep(0.1)
-    if proc.poll() is not None:
-        out = proc.stdout.read() if proc.stdout else ""
-        raise RuntimeError(f"Server exited immediately.\nOutput:\n{out}")
-
-    last_err = None
-    for _ in range(CONNECT_RETRIES):
+    # Server output goes to an anonymous temp file rather than a pipe: nobody
+    # drains it while tests run, and a full pipe would block the server
+    # mid-print. The child keeps its own fd, so our copy can be closed once
+    # the server is up; it is only read back when reporting a failure.
+    with tempfile.TemporaryFile() as log:
+        # No cwd and close_fds=False keep subprocess on its posix_spawn() fast
+        # path on Linux/macOS (server.py finds protocol.py via its own dir).
+        # Python fds are non-inheritable by default, so the listening socket
+        # is the only one we deliberately let through; pass_fds would force
+        # the slower fork path.
+        os.set_inheritable(listen_sock.fileno(), True)
+        try:
+            proc = subprocess.Popen(
+                [sys.executable, server_path],
+                env=env,
+                close_fds=False,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        finally:
+            # The server has its own copy now. Dropping ours means a server
+            # that dies shows up as a refused connect, not a silent backlog.
+            listen_sock.close()
+
+        # The port is already listening, so connect() succeeds even before
+        # the server runs; one request/reply round-trip proves it is serving
         try:
-            with socket.create_connection((HOST, port), timeout=0.25):
-                return proc
+            with open_socket(port, timeout=CONNECT_TIMEOUT_S) as s:
+                s.sendall(b"WHOAMI\n")
+                if s.recv(READ_BUFFER_BYTES):
+                    return proc
+                last_err = "connection closed before reply"
         except OSError as e:
             last_err = e
-            time.sleep(CONNECT_SLEEP_S)
 
-    out = ""
-    try:
-        if proc.stdout:
-            out = proc.stdout.read()
-    except Exception:
-        pass
+        if proc.poll() is not None:
+            raise RuntimeError(f"Server exited immediately.\nOutput:\n{_read_log(log)}")
+        stop_server(proc)
+        raise RuntimeError(
+            f"Server did not become ready on port {port}. Last error: {last_err}\n"
+            f"Server output so far:\n{_read_log(log)}"
+        )
+
+
+# One server per test process. Under pytest-xdist every worker is its own
+# process, so each worker lazily gets a private server on its own port.
+_SERVER = None  # (proc, port)
+
+
+def get_server_port() -> int:
+    global _SERVER
+    if _SERVER is None:
+        listen_sock = open_listening_socket()
+        port = listen_sock.getsockname()[1]
+        proc = start_server(listen_sock)
+        atexit.register(stop_server, proc)
+        _SERVER = (proc, port)
+    return _SERVER[1]
 
-    stop_server(proc)
-    raise RuntimeError(
-        f"Server did not become ready on port {port}. Last error: {last_err}\n"
-        f"Server output so far:\n{out}"
-    )
+
+# Verbs whose replies are count-framed, mapped to their header prefix
+_COUNT_FRAMED = {"LIST": "OK LIST ", "HELP": "OK HELP "}
+
+
+def _verb(line: str) -> str:
+    # Only LIST/HELP need recognising and both are four letters; a longer
+    # word that merely starts with one still fails the header-prefix check
+    return line[:4].upper().rstrip()
 
 
 # Buffered socket client
 class BufConn:
     """
     Buffered line reader so we never discard bytes that arrive after the first newline.
+    Reads go through a C-level BufferedReader from socket.makefile(); writes
+    use the raw socket.
     """
     def __init__(self, sock: socket.socket):
         self.sock = sock
-        self.buf = b""
+        self.rfile = sock.makefile("rb", buffering=READ_BUFFER_BYTES)
 
     def close(self):
-        try:
-            self.sock.close()
-        except Exception:
-            pass
+        # Close the reader first; the socket only really closes once no
+        # makefile() objects reference it
+        for f in (self.rfile, self.sock):
+            try:
+                f.close()
+            except Exception:
+                pass
 
     def send(self, line: str):
         self.sock.sendall((line.rstrip("\n") + "\n").encode("utf-8"))
@@ -100,14 +182,21 @@ class BufConn:
     def send_raw(self, data: bytes):
         self.sock.sendall(data)
 
+    def _readline_bytes(self) -> bytes:
+        line = self.rfile.readline()
+        if not line.endswith(b"\n"):
+            raise RuntimeError("connection closed while reading line")
+        return line
+
     def read_line(self) -> str:
-        while b"\n" not in self.buf:
-            chunk = self.sock.recv(4096)
-            if not chunk:
-                raise RuntimeError("connection closed while reading line")
-            self.buf += chunk
-        line, self.buf = self.buf.split(b"\n", 1)
-        return (line + b"\n").decode("utf-8")
+        return self._readline_bytes().decode("utf-8")
+
+    def read_line_ascii(self) -> str:
+        """
+        For replies the protocol guarantees are ASCII (status lines, errors);
+        the ascii codec is cheaper than utf-8 and fails loudly otherwise.
+        """
+        return self._readline_bytes().decode("ascii")
 
     def read_count_framed(self, first_line: str, prefix: str) -> str:
         """
@@ -128,29 +217,64 @@ class BufConn:
             lines.append(self.read_line())
         return "".join(lines)
 
-    def cmd(self, line: str) -> str:
+    def read_response(self, op: str) -> str:
+        first = self.read_line()
+        # LIST and HELP are count-framed; everything else is a single line
+        prefix = _COUNT_FRAMED.get(op)
+        return self.read_count_framed(first, prefix) if prefix else first
+
+    def cmd_many(self, lines: list[str], op: Optional[str] = None) -> list[str]:
+        """
+        Pipeline several commands in one send, then read their responses in order.
+        Pass op when every line is the same verb to skip parsing each one.
+        """
+        self.send_raw(("\n".join(line.rstrip("\n") for line in lines) + "\n").encode("utf-8"))
+        return [self.read_response(op or _verb(line)) for line in lines]
+
+    def cmd(self, line: str, op: Optional[str] = None) -> str:
         """
         Send command and read response deterministically based on protocol framing.
         """
-        op = line.strip().split(" ", 1)[0].upper()
         self.send(line)
-        first = self.read_line()
-
-        # LIST and HELP are count-framed
-        if op == "LIST":
-            return self.read_count_framed(first, "OK LIST ")
-        if op == "HELP":
-            return self.read_count_framed(first, "OK HELP ")
-
-        # Everything else: single line
-        return first
+        return self.read_response(op or _verb(line))
 
 
 def connect(port: int) -> BufConn:
-    s = socket.create_connection((HOST, port), timeout=1.0)
+    s = open_socket(port, timeout=1.0)
     return BufConn(s)
 
 
+class ConnPool:
+    """
+    Thread-safe pool of connections that are logged in once up front.
+    Borrow one with `with pool.get() as conn:`; it is returned on exit.
+    """
+    def __init__(self, port: int, size: int, login: str):
+        self._q = queue.LifoQueue()
+        for _ in range(size):
+            conn = connect(port)
+            resp = conn.cmd(login)
+            if not resp.startswith("OK Logged in as "):
+                conn.close()
+                raise RuntimeError(f"pool login failed: {resp!r}")
+            self._q.put(conn)
+
+    @contextmanager
+    def get(self, timeout: float = 10.0):
+        conn = self._q.get(timeout=timeout)
+        try:
+            yield conn
+        finally:
+            self._q.put(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                self._q.get_nowait().close()
+            except queue.Empty:
+                return
+
+
 def parse_post_id(ok_line: str) -> int:
     # "OK Post <id> created\n"
     parts = ok_line.strip().split()
@@ -161,18 +285,33 @@ def parse_post_id(ok_line: str) -> int:
 class BulletinBoardFullSuite(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        cls.port = pick_free_port()
-        cls.proc = start_server(cls.port)
+        cls.port = get_server_port()
+        # Long-lived admin session used to wipe the board before each test
+        cls.admin = connect(cls.port)
+        cls.admin.cmd("LOGIN admin adminpw")
+        cls.admin_pool = ConnPool(cls.port, ADMIN_POOL_SIZE, "LOGIN admin adminpw")
+        # Client connection shared by every test; setUp logs it out again
+        cls.c = connect(cls.port)
 
     @classmethod
     def tearDownClass(cls):
-        stop_server(cls.proc)
+        cls.c.close()
+        cls.admin_pool.close_all()
+        cls.admin.close()
 
     def setUp(self):
-        self.c = connect(self.port)
+        self.assertEqual(self.admin.cmd("RESET"), "OK Reset\n")
 
-    def tearDown(self):
-        self.c.close()
+        # Reuse the shared connection unless the previous test closed it
+        # (QUIT, malformed input) or left responses unread
+        cls = type(self)
+        try:
+            reusable = cls.c.cmd("RESET_SESSION") == "OK Session reset\n"
+        except (OSError, RuntimeError):
+            reusable = False
+        if not reusable:
+            cls.c.close()
+            cls.c = connect(cls.port)
 
     # HELP
     def test_help_general(self):
@@ -198,35 +337,73 @@ class BulletinBoardFullSuite(unittest.TestCase):
         r = self.c.cmd("FLY 123")
         self.assertEqual(r, "ERR UNKNOWN_COMMAND\n")
 
+    def test_verbs_case_insensitive(self):
+        self.assertEqual(self.c.cmd("login oliver pw1"), "OK Logged in as oliver (user)\n")
+        self.assertEqual(self.c.cmd("WhoAmI"), "OK WHOAMI oliver user\n")
+        self.assertEqual(self.c.cmd("LOGOUT"), "ERR UNKNOWN_COMMAND\n")
+
     # ---- Auth and identity ----
     def test_auth_required(self):
-        self.assertEqual(self.c.cmd("WHOAMI"), "ERR Not logged in\n")
-        self.assertEqual(self.c.cmd("POST hi"), "ERR Not logged in\n")
-        self.assertEqual(self.c.cmd("LIST"), "ERR Not logged in\n")
-        self.assertEqual(self.c.cmd("GET 1"), "ERR Not logged in\n")
-        self.assertEqual(self.c.cmd("DEL 1"), "ERR Not logged in\n")
+        # Every reply is a single line, so pipeline all five in one send
+        self.c.send_raw(b"WHOAMI\nPOST hi\nLIST\nGET 1\nDEL 1\n")
+        for expected in ("ERR Not logged in\n",) * 5:
+            self.assertEqual(self.c.read_line_ascii(), expected)
 
     def test_login_success_and_whoami(self):
         self.assertEqual(self.c.cmd("LOGIN oliver pw1"), "OK Logged in as oliver (user)\n")
         self.assertEqual(self.c.cmd("WHOAMI"), "OK WHOAMI oliver user\n")
 
     def test_login_invalid(self):
-        self.assertEqual(self.c.cmd("LOGIN oliver wrong"), "ERR Invalid credentials\n")
-        self.assertEqual(self.c.cmd("LOGIN nosuch pw"), "ERR Invalid credentials\n")
+        self.c.send_raw(b"LOGIN oliver wrong\nLOGIN nosuch pw\n")
+        self.assertEqual(self.c.read_line_ascii(), "ERR Invalid credentials\n")
+        self.assertEqual(self.c.read_line_ascii(), "ERR Invalid credentials\n")
 
     def test_login_bad_syntax(self):
-        self.assertEqual(self.c.cmd("LOGIN oliver"), "ERR BAD_SYNTAX\n")
-        self.assertEqual(self.c.cmd("LOGIN oliver pw1 extra"), "ERR BAD_SYNTAX\n")
+        self.c.send_raw(b"LOGIN oliver\nLOGIN oliver pw1 extra\n")
+        self.assertEqual(self.c.read_line_ascii(), "ERR BAD_SYNTAX\n")
+        self.assertEqual(self.c.read_line_ascii(), "ERR BAD_SYNTAX\n")
 
     def test_login_already_logged_in(self):
         self.assertEqual(self.c.cmd("LOGIN sam pw2"), "OK Logged in as sam (user)\n")
         self.assertEqual(self.c.cmd("LOGIN sam pw2"), "ERR Already logged in\n")
 
+    # RESET
+    def test_reset_requires_admin(self):
+        self.assertEqual(self.c.cmd("RESET"), "ERR Not logged in\n")
+        self.c.cmd("LOGIN oliver pw1")
+        self.assertEqual(self.c.cmd("RESET"), "ERR Not authorized\n")
+
+    def test_reset_clears_board(self):
+        self.c.cmd("LOGIN oliver pw1")
+        self.c.cmd("POST before-reset")
+        self.assertEqual(self.admin.cmd("RESET extra"), "ERR BAD_SYNTAX\n")
+        self.assertEqual(self.admin.cmd("RESET"), "OK Reset\n")
+        self.assertEqual(self.c.cmd("LIST"), "OK LIST 0\n")
+        self.assertEqual(self.c.cmd("POST after-reset"), "OK Post 1 created\n")
+
+    def test_reset_session_logs_out(self):
+        self.c.cmd("LOGIN oliver pw1")
+        self.assertEqual(self.c.cmd("RESET_SESSION extra"), "ERR BAD_SYNTAX\n")
+        self.assertEqual(self.c.cmd("RESET_SESSION"), "OK Session reset\n")
+        self.assertEqual(self.c.cmd("WHOAMI"), "ERR Not logged in\n")
+        self.assertEqual(self.c.cmd("LOGIN sam pw2"), "OK Logged in as sam (user)\n")
+
     # POST/GET/LIST
     def test_post_empty(self):
         self.c.cmd("LOGIN oliver pw1")
         self.assertEqual(self.c.cmd("POST     "), "ERR Empty message\n")
 
+    def test_unicode_whitespace_separates_arguments(self):
+        """
+        Whitespace is str.split() whitespace, not just ASCII: an ideographic
+        space alone is an empty message, and it separates LOGIN/GET arguments.
+        """
+        self.assertEqual(self.c.cmd("LOGIN oliver\u3000pw1"), "OK Logged in as oliver (user)\n")
+        self.assertEqual(self.c.cmd("POST \u3000"), "ERR Empty message\n")
+        pid = parse_post_id(self.c.cmd("POST hi"))
+        self.assertTrue(self.c.cmd(f"GET \u00a0{pid}\u3000").startswith(f"OK {pid} "))
+        self.assertEqual(self.c.cmd("GET 1\u30002"), "ERR BAD_SYNTAX\n")
+
     def test_post_get_roundtrip(self):
         self.c.cmd("LOGIN oliver pw1")
         ok = self.c.cmd("POST hello world")
@@ -239,10 +416,11 @@ class BulletinBoardFullSuite(unittest.TestCase):
         self.assertIn(" hello world\n", g)
 
     def test_get_not_found_and_syntax(self):
-        self.c.cmd("LOGIN oliver pw1")
-        self.assertEqual(self.c.cmd("GET"), "ERR BAD_SYNTAX\n")
-        self.assertEqual(self.c.cmd("GET x"), "ERR BAD_SYNTAX\n")
-        self.assertEqual(self.c.cmd("GET 999999"), "ERR Not found\n")
+        self.c.send_raw(b"LOGIN oliver pw1\nGET\nGET x\nGET 999999\n")
+        self.assertEqual(self.c.read_line_ascii(), "OK Logged in as oliver (user)\n")
+        self.assertEqual(self.c.read_line_ascii(), "ERR BAD_SYNTAX\n")
+        self.assertEqual(self.c.read_line_ascii(), "ERR BAD_SYNTAX\n")
+        self.assertEqual(self.c.read_line_ascii(), "ERR Not found\n")
 
     def test_list_count_and_format(self):
         self.c.cmd("LOGIN oliver pw1")
@@ -258,16 +436,44 @@ class BulletinBoardFullSuite(unittest.TestCase):
         count = int(header[2])
         self.assertEqual(len(lines) - 1, count)
 
+    def test_list_reflects_post_and_del(self):
+        """
+        LIST responses are cached server-side; POST and DEL must invalidate them.
+        """
+        self.c.cmd("LOGIN oliver pw1")
+        before = self.c.cmd("LIST")
+        pid = parse_post_id(self.c.cmd("POST cache-check"))
+
+        after_post = self.c.cmd("LIST")
+        self.assertNotEqual(before, after_post)
+        self.assertIn(f"{pid} oliver ", after_post)
+
+        self.c.cmd(f"DEL {pid}")
+        after_del = self.c.cmd("LIST")
+        self.assertNotIn(f"{pid} oliver ", after_del)
+
+    def test_list_ascending_after_deletes(self):
+        self.c.cmd("LOGIN oliver pw1")
+        ids = [parse_post_id(self.c.cmd(f"POST order-{i}")) for i in range(4)]
+        self.c.cmd(f"DEL {ids[1]}")
+        ids.append(parse_post_id(self.c.cmd("POST order-last")))
+
+        listed = [int(line.split()[0]) for line in self.c.cmd("LIST").splitlines()[1:]]
+        self.assertEqual(listed, sorted(listed))
+        self.assertNotIn(ids[1], listed)
+        self.assertEqual(listed[-1], ids[-1])
+
     def test_list_bad_syntax(self):
         self.c.cmd("LOGIN oliver pw1")
         self.assertEqual(self.c.cmd("LIST extra"), "ERR BAD_SYNTAX\n")
 
     # DEL
     def test_del_syntax_and_not_found(self):
-        self.c.cmd("LOGIN oliver pw1")
-        self.assertEqual(self.c.cmd("DEL"), "ERR BAD_SYNTAX\n")
-        self.assertEqual(self.c.cmd("DEL x"), "ERR BAD_SYNTAX\n")
-        self.assertEqual(self.c.cmd("DEL 999999"), "ERR Not found\n")
+        self.c.send_raw(b"LOGIN oliver pw1\nDEL\nDEL x\nDEL 999999\n")
+        self.assertEqual(self.c.read_line_ascii(), "OK Logged in as oliver (user)\n")
+        self.assertEqual(self.c.read_line_ascii(), "ERR BAD_SYNTAX\n")
+        self.assertEqual(self.c.read_line_ascii(), "ERR BAD_SYNTAX\n")
+        self.assertEqual(self.c.read_line_ascii(), "ERR Not found\n")
 
     def test_del_own_post(self):
         self.c.cmd("LOGIN oliver pw1")
@@ -380,16 +586,16 @@ class BulletinBoardFullSuite(unittest.TestCase):
         Send a command in pieces to ensure server buffering handles partial reads.
         """
         self.c.send_raw(b"LOGIN ol")
-        time.sleep(0.02)
+        time.sleep(PARTIAL_SEND_PAUSE_S)
         self.c.send_raw(b"iver pw")
-        time.sleep(0.02)
+        time.sleep(PARTIAL_SEND_PAUSE_S)
         self.c.send_raw(b"1\n")
         self.assertEqual(self.c.read_line(), "OK Logged in as oliver (user)\n")
 
         self.c.send_raw(b"POST hel")
-        time.sleep(0.02)
+        time.sleep(PARTIAL_SEND_PAUSE_S)
         self.c.send_raw(b"lo")
-        time.sleep(0.02)
+        time.sleep(PARTIAL_SEND_PAUSE_S)
         self.c.send_raw(b" world\n")
         ok = self.c.read_line()
         self.assertTrue(ok.startswith("OK Post "))
@@ -397,7 +603,7 @@ class BulletinBoardFullSuite(unittest.TestCase):
     # Concurrency
     def test_concurrent_posting_and_deleting(self):
         """
-        This is a practical stress test for select()-based multi-client handling.
+        This is a practical stress test for selectors-based multi-client handling.
         It cannot prove absence of races in theory, but it will catch common bugs:
             - dropped connections
             - corrupted framing
@@ -417,78 +623,64 @@ class BulletinBoardFullSuite(unittest.TestCase):
                 else:
                     self.assertEqual(c.cmd("LOGIN sam pw2"), "OK Logged in as sam (user)\n")
 
-            created_ids = []
-            created_ids_lock = threading.Lock()
-
-            def poster(conn: BufConn, idx: int):
+            def poster(conn: BufConn, idx: int) -> list[int]:
                 local_ids = []
-                for j in range(POSTS_PER_CLIENT):
-                    ok = conn.cmd(f"POST c{idx}-m{j}")
+                # One pipelined burst per client instead of a round-trip per POST
+                batch = [f"POST c{idx}-m{j}" for j in range(POSTS_PER_CLIENT)]
+                for ok in conn.cmd_many(batch, op="POST"):
                     if ok.startswith("OK Post "):
                         local_ids.append(parse_post_id(ok))
                     else:
                         raise AssertionError(f"POST failed: {ok!r}")
-                with created_ids_lock:
-                    created_ids.extend(local_ids)
-
-            threads = []
-            for i, c in enumerate(conns):
-                t = threading.Thread(target=poster, args=(c, i), daemon=True)
-                t.start()
-                threads.append(t)
-
-            for t in threads:
-                t.join(timeout=10)
-                self.assertFalse(t.is_alive(), "poster thread hung (server may be stuck)")
-
-            # Verify LIST count >= total created (other tests might have created posts too)
-            checker = connect(self.port)
-            try:
-                checker.cmd("LOGIN admin adminpw")
-                r = checker.cmd("LIST")
-                self.assertTrue(r.startswith("OK LIST "))
-                # Parse count
-                count = int(r.splitlines()[0].split()[2])
-                self.assertGreaterEqual(count, len(created_ids))
-            finally:
-                checker.close()
-
-            # Now concurrently delete a subset as admin
-            to_delete = created_ids[: max(1, len(created_ids)//2)]
-            del_lock = threading.Lock()
-            del_errors = []
-
-            def deleter(ids_slice):
-                # Each thread gets its own connection
-                adm = connect(self.port)
-                try:
-                    login_resp = adm.cmd("LOGIN admin adminpw")
-                    if login_resp != "OK Logged in as admin (admin)\n":
-                        with del_lock:
-                            del_errors.append(("LOGIN", login_resp))
-                        return
+                return local_ids
 
+            def deleter(ids_slice) -> list:
+                errors = []
+                # Borrow an already-authenticated admin connection
+                with self.admin_pool.get() as adm:
                     for pid in ids_slice:
-                        resp = adm.cmd(f"DEL {pid}")
+                        resp = adm.cmd(f"DEL {pid}", op="DEL")
                         if not resp.startswith("OK Deleted ") and resp != "ERR Not found\n":
-                            with del_lock:
-                                del_errors.append((pid, resp))
+                            errors.append((pid, resp))
+                return errors
+
+            # One pool of worker threads serves both phases; result() re-raises
+            # any exception from a worker, and a hung worker trips the timeout.
+            # Not a `with` block: its shutdown(wait=True) would then block on
+            # that hung worker instead of failing fast.
+            ex = ThreadPoolExecutor(max_workers=N_CLIENTS)
+            try:
+                created_ids = []
+                futs = [ex.submit(poster, c, i) for i, c in enumerate(conns)]
+                for fut in as_completed(futs, timeout=10):
+                    created_ids.extend(fut.result())
+
+                # setUp reset the board, so LIST must show exactly the posts
+                # created here; any lost POST would make the count fall short
+                checker = connect(self.port)
+                try:
+                    checker.cmd("LOGIN admin adminpw")
+                    r = checker.cmd("LIST")
+                    self.assertTrue(r.startswith("OK LIST "))
+                    # Parse count
+                    count = int(r.splitlines()[0].split()[2])
+                    self.assertEqual(count, len(created_ids))
                 finally:
-                    adm.close()
-
-            # Split into chunks
-            k = 4
-            chunks = [to_delete[i::k] for i in range(k)]
+                    checker.close()
 
-            del_threads = []
-            for ch in chunks:
-                t = threading.Thread(target=deleter, args=(ch,), daemon=True)
-                t.start()
-                del_threads.append(t)
+                # Now concurrently delete a subset as admin, split into chunks
+                to_delete = created_ids[: max(1, len(created_ids)//2)]
+                k = ADMIN_POOL_SIZE
+                chunks = [to_delete[i::k] for i in range(k)]
 
-            for t in del_threads:
-                t.join(timeout=10)
-                self.assertFalse(t.is_alive(), "deleter thread hung")
+                del_errors = []
+                futs = [ex.submit(deleter, ch) for ch in chunks]
+                for fut in as_completed(futs, timeout=10):
+                    del_errors.extend(fut.result())
+            finally:
+                # A stuck worker is released by its socket timeout or by the
+                # connections being closed below
+                ex.shutdown(wait=False, cancel_futures=True)
 
             self.assertEqual(del_errors, [], f"Unexpected delete errors: {del_errors[:5]}")
 
@@ -504,11 +696,8 @@ class BulletinBoardFullSuite(unittest.TestCase):
         - server sends ERR Line too long\n (best-effort)
         - server closes connection
         """
-        # Must be larger than MAX_BUFFER_BYTES in server.py (64KB)
-        huge = "A" * (70 * 1024)
-
         # Send as one "command" line
-        self.c.send_raw((huge + "\n").encode("utf-8"))
+        self.c.send_raw(_HUGE_LINE)
 
         try:
             line = self.c.read_line()
@@ -518,7 +707,56 @@ class BulletinBoardFullSuite(unittest.TestCase):
                 _ = self.c.read_line()
         except Exception:
             pass
-            
+
+    def test_pipelined_short_lines_exceeding_buffer_limit(self):
+        """
+        The size limit applies to a single line, not to how much a client
+        pipelines: far more than 64KB of short commands must all be answered.
+        """
+        n = 25_000  # 175KB of requests, well past two full receive buffers
+        with ThreadPoolExecutor(max_workers=1) as ex:
+            # Send from a worker so replies are drained while requests go out
+            sender = ex.submit(self.c.send_raw, b"WHOAMI\n" * n)
+            for _ in range(n):
+                self.assertEqual(self.c.read_line_ascii(), "ERR Not logged in\n")
+            sender.result(timeout=10)
+
+    def test_pipelined_output_past_high_water_mark(self):
+        """
+        The server stops executing a client's requests while a lot of its
+        output is unread; every request must still be answered once the
+        client catches up.
+        """
+        self.c.cmd("LOGIN oliver pw1")
+        self.c.cmd_many([f"POST filler message {i}" for i in range(200)], op="POST")
+        n = 300  # ~2.5MB of LIST output, over MAX_OUTPUT_BYTES in server.py
+        with ThreadPoolExecutor(max_workers=1) as ex:
+            sender = ex.submit(self.c.send_raw, b"LIST\n" * n)
+            for _ in range(n):
+                first = self.c.read_line()
+                self.assertEqual(first, "OK LIST 200\n")
+                self.c.read_count_framed(first, "OK LIST ")
+            sender.result(timeout=10)
+        self.assertEqual(self.c.cmd("WHOAMI"), "OK WHOAMI oliver user\n")
+
+    def test_line_limit_counts_bytes_not_characters(self):
+        """
+        The line limit is measured in UTF-8 bytes: 40k two-byte characters
+        fit in 64K characters but not in 64KB, so the server must reject it.
+        """
+        self.c.cmd("LOGIN oliver pw1")
+        self.c.send_raw(("POST " + "\u00e9" * (40 * 1024) + "\n").encode("utf-8"))
+
+        try:
+            line = self.c.read_line()
+        except (RuntimeError, OSError):
+            # A reset can race the best-effort error line; the close is what matters
+            line = None
+        if line is not None:
+            self.assertEqual(line, "ERR Line too long\n")
+            with self.assertRaises(Exception):
+                _ = self.c.read_line()
+
     def test_invalid_utf8_disconnects(self):
         """
         Send invalid UTF-8 bytes; server should close the connection.
@@ -527,5 +765,16 @@ class BulletinBoardFullSuite(unittest.TestCase):
         with self.assertRaises(Exception):
             _ = self.c.read_line()
 
+    def test_invalid_utf8_after_valid_line_still_answers_it(self):
+        """
+        A valid command that shares a read with invalid bytes has already
+        been executed, so its reply must arrive before the disconnect.
+        """
+        self.c.cmd("LOGIN oliver pw1")
+        self.c.send_raw(b"POST hi\n\xff\n")
+        self.assertTrue(self.c.read_line().startswith("OK Post "))
+        with self.assertRaises(Exception):
+            _ = self.c.read_line()
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
\ No newline at end of file